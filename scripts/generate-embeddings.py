@@ -6,21 +6,36 @@ This script:
 1. Reads packing items from CSV
 2. Generates embeddings using OpenAI text-embedding-3-small
 3. Formats data as Qdrant points
-4. Saves to JSON file for import
+4. Saves vectors to a .npy file and payloads to a JSONL file for import
+
+Embeddings are cached on disk (keyed by a SHA-256 of model, dimensions,
+PROMPT_VERSION and the row's data), so re-runs only call the API for rows
+whose data changed.
 
 Usage:
     # Ensure .env file exists with OPENAI_API_KEY
     python3 scripts/generate-embeddings.py
 """
 
-import csv
-import json
+import asyncio
+import base64
+import hashlib
+import importlib.util
 import os
+import random
+import sqlite3
 import sys
 import uuid
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
-from openai import OpenAI
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
+import numpy as np
+import orjson
+import openai
+import pandas as pd
+import tiktoken
+from openai import AsyncOpenAI
 from tqdm import tqdm
 import time
 
@@ -43,42 +58,113 @@ def load_env_file():
 
 # Configuration
 CSV_FILE = "data/packing-knowledge.csv"
-OUTPUT_FILE = "data/packing-embeddings.json"
+OUTPUT_FILE = "data/packing-embeddings.jsonl"
+VECTORS_FILE = "data/packing-embeddings.npy"
+CACHE_FILE = "data/.embedding-cache.sqlite"
 EMBEDDING_MODEL = "text-embedding-3-small"
 EMBEDDING_DIMENSIONS = 1536
-BATCH_SIZE = 100  # Process in batches for API rate limits
-RETRY_ATTEMPTS = 3
-RETRY_DELAY = 2  # seconds
+PROMPT_VERSION = "v1"  # Bump when the embedding text changes meaning, to re-embed every row
+CSV_CHUNK_SIZE = 1000  # Rows parsed per read_csv chunk
+PYARROW_MIN_BYTES = 5_000_000  # Use pyarrow's multithreaded CSV parser above this size
+MAX_BATCH_ITEMS = 2048  # API limit on inputs per embeddings request
+MAX_BATCH_TOKENS = 250_000  # Headroom under the API's 300k tokens per request
+MAX_INPUT_TOKENS = 8000  # Stay under the API's 8192-token limit per input
+TRUNCATED_INPUT_TOKENS = 7500  # Oversized inputs are cut down to this many tokens
+MAX_CONCURRENT_BATCHES = 8  # Batch requests in flight at the same time
+RETRY_ATTEMPTS = 5
+MAX_RETRY_DELAY = 60  # seconds, cap for exponential backoff
+
+# Namespace for deterministic point IDs, so re-imports upsert instead of duplicating
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "smart-packing-assistant/packing-knowledge")
+
+# Knowledge base columns, as stored in each point's payload
+ROW_FIELDS = (
+    'item', 'category', 'destination_type', 'travel_type', 'season',
+    'quantity', 'reason', 'importance', 'tags', 'climate'
+)
+
+# Text sent for embedding; list fields use the *_text joins made at load time
+EMBEDDING_TEXT_TEMPLATE = (
+    "Item: %(item)s\n"
+    "Category: %(category)s\n"
+    "Travel Type: %(travel_type)s\n"
+    "Destination: %(destination_type)s\n"
+    "Season: %(season_text)s\n"
+    "Reason: %(reason)s\n"
+    "Tags: %(tags_text)s\n"
+    "Climate: %(climate_text)s\n"
+    "Importance: %(importance)s"
+)
+
+# API errors worth retrying; anything else (bad request, auth) fails immediately
+TRANSIENT_API_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+class EmbeddingGenerationError(Exception):
+    """Raised when embeddings can't be generated; main() reports it and exits."""
+
+@lru_cache(maxsize=None)
+def get_encoding() -> tiktoken.Encoding:
+    """Tokenizer for the embedding model, loaded on first use and reused."""
+    try:
+        return tiktoken.encoding_for_model(EMBEDDING_MODEL)
+    except Exception as e:
+        raise EmbeddingGenerationError(f"Could not load tokenizer for {EMBEDDING_MODEL}: {e}") from e
+
+def split_list_column(column: pd.Series, sep: str) -> pd.Series:
+    """Split a delimited text column into lists of stripped, non-empty values."""
+    return column.str.split(sep).map(lambda values: [v.strip() for v in values if v.strip()])
+
+def read_csv_chunks(csv_path: str) -> Iterator[pd.DataFrame]:
+    """Read the CSV as a sequence of DataFrames.
 
-def load_knowledge_base(csv_path: str) -> List[Dict[str, Any]]:
-    """Load packing knowledge from CSV file."""
-    items = []
+    Files larger than PYARROW_MIN_BYTES are parsed in one go by pyarrow's
+    multithreaded reader (when installed); smaller files are streamed in
+    chunks of CSV_CHUNK_SIZE rows with the default parser.
+    """
+    options = {'dtype': {'quantity': 'int32'}, 'keep_default_na': False}
+    if (os.path.getsize(csv_path) > PYARROW_MIN_BYTES
+            and importlib.util.find_spec('pyarrow') is not None):
+        yield pd.read_csv(csv_path, engine='pyarrow', **options)
+    else:
+        yield from pd.read_csv(csv_path, chunksize=CSV_CHUNK_SIZE, **options)
+
+def load_knowledge_base(csv_path: str) -> Iterator[List[Dict[str, Any]]]:
+    """Stream packing knowledge from CSV file, one chunk of items at a time.
+
+    Small files are parsed in chunks of CSV_CHUNK_SIZE rows, so consumers
+    can start working on the first items before the whole file has been read.
+    """
     print(f"📖 Loading knowledge base from {csv_path}...")
+    total = 0
 
     try:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Parse comma-separated fields
-                seasons = [s.strip() for s in row['season'].split(',')]
-                tags = [t.strip() for t in row.get('tags', '').split(';') if t.strip()]
-                climate = [c.strip() for c in row.get('climate', '').split(';') if c.strip()]
-
-                items.append({
-                    'item': row['item'],
-                    'category': row['category'],
-                    'destination_type': row['destination_type'],
-                    'travel_type': row['travel_type'],
-                    'season': seasons,
-                    'quantity': int(row['quantity']),
-                    'reason': row['reason'],
-                    'importance': row['importance'],
-                    'tags': tags,
-                    'climate': climate
-                })
-
-        print(f"✅ Loaded {len(items)} items from knowledge base")
-        return items
+        for df in read_csv_chunks(csv_path):
+            # tags and climate are optional columns
+            for column in ('tags', 'climate'):
+                if column not in df:
+                    df[column] = ''
+
+            # Parse delimited fields column-wise
+            df['season'] = df['season'].str.split(',').map(lambda values: [v.strip() for v in values])
+            df['tags'] = split_list_column(df['tags'], ';')
+            df['climate'] = split_list_column(df['climate'], ';')
+
+            # Join list fields once for the embedding text
+            for column in ('season', 'tags', 'climate'):
+                df[f'{column}_text'] = df[column].str.join(', ')
+
+            items = df[[
+                *ROW_FIELDS, 'season_text', 'tags_text', 'climate_text'
+            ]].to_dict(orient='records')
+
+            total += len(items)
+            yield items
+
+        print(f"\n✅ Loaded {total} items from knowledge base")
 
     except FileNotFoundError:
         print(f"❌ Error: File not found: {csv_path}")
@@ -94,138 +180,308 @@ def create_embedding_text(item: Dict[str, Any]) -> str:
     This text is what OpenAI will convert to a vector.
     It includes all relevant information about the item.
     """
-    return f"""Item: {item['item']}
-Category: {item['category']}
-Travel Type: {item['travel_type']}
-Destination: {item['destination_type']}
-Season: {', '.join(item['season'])}
-Reason: {item['reason']}
-Tags: {', '.join(item['tags'])}
-Climate: {', '.join(item['climate'])}
-Importance: {item['importance']}""".strip()
-
-def generate_embeddings(items: List[Dict[str, Any]], api_key: str) -> List[Dict[str, Any]]:
-    """Generate embeddings for all items using OpenAI API."""
-    client = OpenAI(api_key=api_key)
-    points = []
-
-    print(f"\n🤖 Generating embeddings for {len(items)} items...")
-    print(f"   Model: {EMBEDDING_MODEL} ({EMBEDDING_DIMENSIONS} dimensions)")
-    print(f"   Batch size: {BATCH_SIZE}")
+    return (EMBEDDING_TEXT_TEMPLATE % item).strip()
 
-    # Process in batches
-    for i in tqdm(range(0, len(items), BATCH_SIZE), desc="Processing batches"):
-        batch = items[i:i + BATCH_SIZE]
-        texts = [create_embedding_text(item) for item in batch]
+def point_id(item: Dict[str, Any]) -> str:
+    """Deterministic Qdrant point ID (UUIDv5) for a row.
 
-        # Retry logic for API calls
-        for attempt in range(RETRY_ATTEMPTS):
+    Derived from item, category and travel type, so the same row always
+    maps to the same point.
+    """
+    identity = f"{item['item']}|{item['category']}|{item['travel_type']}"
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, identity))
+
+def build_point(item: Dict[str, Any], vector: np.ndarray) -> Dict[str, Any]:
+    """Format an item and its embedding as a Qdrant point."""
+    return {
+        'id': point_id(item),
+        'vector': vector,
+        'payload': {field: item[field] for field in ROW_FIELDS}
+    }
+
+def embedding_cache_key(item: Dict[str, Any]) -> str:
+    """Cache key for an item's embedding, derived from its row data.
+
+    Keying on the row rather than the rendered text means cosmetic changes
+    to EMBEDDING_TEXT_TEMPLATE still hit the cache; bump PROMPT_VERSION to
+    force a re-embed. Model and dimensions are part of the key so switching
+    either one never returns a stale vector.
+    """
+    row = sorted((field, item[field]) for field in ROW_FIELDS)
+    raw = orjson.dumps((EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, PROMPT_VERSION, row))
+    return hashlib.sha256(raw).hexdigest()
+
+def open_embedding_cache(cache_path: str) -> sqlite3.Connection:
+    """Open the on-disk embedding cache, creating it if needed."""
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    conn = sqlite3.connect(cache_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS cache "
+        "(key TEXT PRIMARY KEY, model TEXT, dims INT, vec BLOB)"
+    )
+    return conn
+
+def retry_delay(attempt: int, error: Exception) -> float:
+    """Seconds to wait before retrying a failed API call.
+
+    Rate limit errors honor the server's Retry-After header. Otherwise the
+    delay grows exponentially with random jitter, so concurrent batches
+    don't all retry at the same moment.
+    """
+    if isinstance(error, openai.RateLimitError):
+        retry_after = error.response.headers.get('retry-after')
+        if retry_after:
             try:
-                response = client.embeddings.create(
-                    model=EMBEDDING_MODEL,
-                    input=texts,
-                    dimensions=EMBEDDING_DIMENSIONS
+                return min(MAX_RETRY_DELAY, float(retry_after))
+            except ValueError:
+                pass  # HTTP-date form, fall back to backoff
+    return min(MAX_RETRY_DELAY, (2 ** attempt) + random.uniform(0, 1))
+
+async def embed_with_backoff(client: AsyncOpenAI, texts: List[str]) -> List[np.ndarray]:
+    """Request embeddings for texts, retrying transient API errors.
+
+    Uses the raw HTTP response and decodes it with orjson, skipping the
+    SDK's per-embedding model validation. Embeddings are requested as
+    base64 so each vector is decoded straight into a float32 array.
+    """
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            response = await client.embeddings.with_raw_response.create(
+                model=EMBEDDING_MODEL,
+                input=texts,
+                dimensions=EMBEDDING_DIMENSIONS,
+                encoding_format="base64"
+            )
+            data = sorted(orjson.loads(response.content)['data'], key=lambda entry: entry['index'])
+            return [
+                np.frombuffer(base64.b64decode(entry['embedding']), dtype=np.float32)
+                for entry in data
+            ]
+
+        except TRANSIENT_API_ERRORS as e:
+            if attempt < RETRY_ATTEMPTS - 1:
+                delay = retry_delay(attempt, e)
+                print(f"\n⚠️  API error (attempt {attempt + 1}/{RETRY_ATTEMPTS}): {e}")
+                print(f"   Retrying in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
+            else:
+                raise EmbeddingGenerationError(f"Failed after {RETRY_ATTEMPTS} attempts: {e}") from e
+
+        except openai.APIError as e:
+            raise EmbeddingGenerationError(f"API error: {e}") from e
+
+async def generate_embeddings(chunks: Iterable[List[Dict[str, Any]]], api_key: str,
+                              cache_path: str) -> List[Dict[str, Any]]:
+    """Generate embeddings for all items using OpenAI API.
+
+    Uncached, deduplicated texts are packed into token-bounded batches that
+    run concurrently while the input is still being read.
+    """
+    # embed_with_backoff is the only retry layer
+    client = AsyncOpenAI(api_key=api_key, max_retries=0)
+    cache = open_embedding_cache(cache_path)
+    sem = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
+
+    print("\n🤖 Generating embeddings...")
+    print(f"   Model: {EMBEDDING_MODEL} ({EMBEDDING_DIMENSIONS} dimensions)")
+    print(f"   Batch limits: {MAX_BATCH_ITEMS} items / {MAX_BATCH_TOKENS} tokens "
+          f"(up to {MAX_CONCURRENT_BATCHES} concurrent)")
+    progress = tqdm(total=0, desc="Processing batches")
+
+    # Every item owns its slot in points, so batches can complete in any order
+    points: List[Dict[str, Any]] = []
+    item_list: List[Dict[str, Any]] = []
+    row_keys: List[str] = []
+
+    # Unique texts, the items sharing each one, and vectors resolved so far
+    unique_texts: List[str] = []
+    idx: Dict[str, int] = {}
+    owners: List[List[int]] = []
+    vectors: Dict[int, np.ndarray] = {}
+    cache_hits = 0
+
+    # First row for each point ID, and rows that would collide in Qdrant
+    id_rows: Dict[str, int] = {}
+    duplicate_ids: List[Tuple[int, int]] = []
+
+    # Knowledge base statistics, counted in the same pass
+    categories, travel_types, importance = Counter(), Counter(), Counter()
+
+    async def run_batch(indices: List[int]):
+        async with sem:
+            batch_vectors = await embed_with_backoff(client, [unique_texts[k] for k in indices])
+
+        # Write this batch's points and cache the packed float32 vectors
+        for k, vec in zip(indices, batch_vectors):
+            vectors[k] = vec
+            blob = vec.tobytes()
+            for i in owners[k]:
+                points[i] = build_point(item_list[i], vec)
+                cache.execute(
+                    "INSERT OR REPLACE INTO cache (key, model, dims, vec) VALUES (?, ?, ?, ?)",
+                    (row_keys[i], EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, blob)
                 )
+        cache.commit()
+        progress.update(1)
+
+    def dispatch(indices: List[int]):
+        tasks.append(asyncio.create_task(run_batch(indices)))
+        progress.total += 1
+        progress.refresh()
 
-                # Format as Qdrant points
-                for j, embedding_obj in enumerate(response.data):
-                    item = batch[j]
-                    point = {
-                        'id': str(uuid.uuid4()),
-                        'vector': embedding_obj.embedding,
-                        'payload': {
-                            'item': item['item'],
-                            'category': item['category'],
-                            'destination_type': item['destination_type'],
-                            'travel_type': item['travel_type'],
-                            'season': item['season'],
-                            'quantity': item['quantity'],
-                            'reason': item['reason'],
-                            'importance': item['importance'],
-                            'tags': item['tags'],
-                            'climate': item['climate']
-                        }
-                    }
-                    points.append(point)
-
-                # Success - break retry loop
+    tasks: List[asyncio.Task] = []
+    pending: List[int] = []
+    pending_tokens = 0
+
+    chunk_iter = iter(chunks)
+    try:
+        while True:
+            # Parse the next chunk in a worker thread so in-flight batches keep running
+            chunk = await asyncio.to_thread(next, chunk_iter, None)
+            if chunk is None:
                 break
 
-            except Exception as e:
-                if attempt < RETRY_ATTEMPTS - 1:
-                    print(f"\n⚠️  API error (attempt {attempt + 1}/{RETRY_ATTEMPTS}): {e}")
-                    print(f"   Retrying in {RETRY_DELAY} seconds...")
-                    time.sleep(RETRY_DELAY)
+            for item in chunk:
+                i = len(points)
+                points.append(None)
+                item_list.append(item)
+                row_keys.append(embedding_cache_key(item))
+                first = id_rows.setdefault(point_id(item), i)
+                if first != i:
+                    duplicate_ids.append((first, i))
+                categories[item['category']] += 1
+                travel_types[item['travel_type']] += 1
+                importance[item['importance']] += 1
+
+                text = create_embedding_text(item)
+                k = idx.get(text)
+                if k is not None:
+                    # Duplicate text: reuse the vector, or wait for its batch
+                    if k in vectors:
+                        points[i] = build_point(item, vectors[k])
+                    else:
+                        owners[k].append(i)
+                    continue
+
+                k = len(unique_texts)
+                unique_texts.append(text)
+                idx[text] = k
+                owners.append([i])
+
+                row = cache.execute("SELECT vec FROM cache WHERE key = ?", (row_keys[i],)).fetchone()
+                if row is not None:
+                    cache_hits += 1
+                    vectors[k] = np.frombuffer(row[0], dtype=np.float32)
+                    points[i] = build_point(item, vectors[k])
                 else:
-                    print(f"\n❌ Failed after {RETRY_ATTEMPTS} attempts: {e}")
-                    sys.exit(1)
-
-        # Rate limiting delay
-        if i + BATCH_SIZE < len(items):
-            time.sleep(0.5)
+                    # Truncate oversized texts so one item can't fail a whole batch
+                    tokens = get_encoding().encode(text)
+                    if len(tokens) > MAX_INPUT_TOKENS:
+                        print(f"\n⚠️  '{item['item']}' is {len(tokens)} tokens, "
+                              f"truncating to {TRUNCATED_INPUT_TOKENS}")
+                        tokens = tokens[:TRUNCATED_INPUT_TOKENS]
+                        unique_texts[k] = get_encoding().decode(tokens)
+                    n_tokens = len(tokens)
+
+                    # Greedily pack by token count, flushing when a cap would be hit
+                    if pending and (len(pending) == MAX_BATCH_ITEMS
+                                    or pending_tokens + n_tokens > MAX_BATCH_TOKENS):
+                        dispatch(pending)
+                        pending, pending_tokens = [], 0
+                    pending.append(k)
+                    pending_tokens += n_tokens
+
+        if pending:
+            dispatch(pending)
+
+        # All input is read; report it before waiting on the remaining batches
+        print_statistics(len(points), categories, travel_types, importance)
+
+        if duplicate_ids:
+            # CSV line numbers: +1 for the header, +1 for 1-based lines
+            rows = "\n".join(
+                f"   - CSV lines {first + 2} and {i + 2}: "
+                f"{item_list[i]['item']} | {item_list[i]['category']} | {item_list[i]['travel_type']}"
+                for first, i in duplicate_ids
+            )
+            raise EmbeddingGenerationError(
+                "Duplicate point IDs (item, category and travel_type must be unique per row):\n" + rows
+            )
+
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # Stop the other batches before the cache is closed under them
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        progress.close()
+        cache.close()
 
     print(f"\n✅ Generated {len(points)} embeddings successfully")
+    print(f"   Unique texts: {len(unique_texts)} ({len(points) - len(unique_texts)} duplicates)")
+    print(f"   Cache: {cache_hits} hits, {len(unique_texts) - cache_hits} embedded ({cache_path})")
     return points
 
-def save_embeddings(points: List[Dict[str, Any]], output_path: str):
-    """Save embeddings to JSON file for Qdrant import."""
-    print(f"\n💾 Saving embeddings to {output_path}...")
+def save_embeddings(points: List[Dict[str, Any]], output_path: str, vectors_path: str):
+    """Save embeddings for Qdrant import.
+
+    Vectors go into a float32 .npy array (one row per point) that the
+    importer can memory-map. Payloads go into a JSONL file whose first
+    line holds the metadata (marked with "__metadata__": true), followed
+    by one {id, payload, row_index} record per point.
+    """
+    print(f"\n💾 Saving embeddings to {output_path} and {vectors_path}...")
 
     try:
-        # Create output directory if it doesn't exist
+        # Create output directories if they don't exist
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                'points': points,
-                'metadata': {
-                    'total_items': len(points),
-                    'embedding_model': EMBEDDING_MODEL,
-                    'dimensions': EMBEDDING_DIMENSIONS,
-                    'generated_at': time.strftime('%Y-%m-%d %H:%M:%S')
-                }
-            }, f, indent=2)
-
-        # Calculate file size
+        os.makedirs(os.path.dirname(vectors_path), exist_ok=True)
+
+        vectors = np.empty((len(points), EMBEDDING_DIMENSIONS), dtype=np.float32)
+        for row, point in enumerate(points):
+            vectors[row] = point['vector']
+        np.save(vectors_path, vectors)
+
+        metadata = {
+            '__metadata__': True,
+            'total_items': len(points),
+            'embedding_model': EMBEDDING_MODEL,
+            'dimensions': EMBEDDING_DIMENSIONS,
+            'vectors_file': os.path.basename(vectors_path),
+            'generated_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(metadata) + b"\n")
+            for row, point in enumerate(points):
+                record = {'id': point['id'], 'payload': point['payload'], 'row_index': row}
+                f.write(orjson.dumps(record) + b"\n")
+
+        # Calculate file sizes
         file_size = os.path.getsize(output_path) / (1024 * 1024)  # MB
+        vectors_size = os.path.getsize(vectors_path) / (1024 * 1024)  # MB
         print(f"✅ Saved {len(points)} points to {output_path}")
-        print(f"   File size: {file_size:.2f} MB")
+        print(f"   File sizes: {file_size:.2f} MB payloads, {vectors_size:.2f} MB vectors")
 
     except Exception as e:
         print(f"❌ Error saving file: {e}")
         sys.exit(1)
 
-def print_statistics(items: List[Dict[str, Any]]):
+def print_statistics(total: int, categories: Counter, travel_types: Counter, importance: Counter):
     """Print statistics about the knowledge base."""
     print("\n📊 Knowledge Base Statistics:")
-    print(f"   Total items: {len(items)}")
-
-    # Count by category
-    categories = {}
-    for item in items:
-        cat = item['category']
-        categories[cat] = categories.get(cat, 0) + 1
+    print(f"   Total items: {total}")
 
     print("   Items by category:")
-    for cat, count in sorted(categories.items()):
+    for cat, count in categories.most_common():
         print(f"      - {cat}: {count}")
 
-    # Count by travel type
-    travel_types = {}
-    for item in items:
-        tt = item['travel_type']
-        travel_types[tt] = travel_types.get(tt, 0) + 1
-
     print("   Items by travel type:")
     for tt, count in sorted(travel_types.items()):
         print(f"      - {tt}: {count}")
 
-    # Count by importance
-    importance = {}
-    for item in items:
-        imp = item['importance']
-        importance[imp] = importance.get(imp, 0) + 1
-
     print("   Items by importance:")
     for imp, count in sorted(importance.items(),
                               key=lambda x: {'critical': 4, 'high': 3, 'medium': 2, 'low': 1}.get(x[0], 0),
@@ -259,17 +515,16 @@ def main():
 
     print(f"✅ OpenAI API key found (starts with '{api_key[:10]}...')")
 
-    # Load knowledge base
-    items = load_knowledge_base(CSV_FILE)
-
-    # Print statistics
-    print_statistics(items)
-
-    # Generate embeddings
-    points = generate_embeddings(items, api_key)
+    # Stream the knowledge base straight into embedding generation
+    chunks = load_knowledge_base(CSV_FILE)
+    try:
+        points = asyncio.run(generate_embeddings(chunks, api_key, CACHE_FILE))
+    except EmbeddingGenerationError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
 
     # Save to file
-    save_embeddings(points, OUTPUT_FILE)
+    save_embeddings(points, OUTPUT_FILE, VECTORS_FILE)
 
     print("\n" + "=" * 70)
     print("✅ Embedding generation complete!")
@@ -3,7 +3,7 @@
 Import embeddings to Qdrant vector database.
 
 This script:
-1. Reads embeddings from JSON file (generated by generate-embeddings.py)
+1. Reads payloads (JSONL) and memory-mapped vectors (.npy) generated by generate-embeddings.py
 2. Creates Qdrant collection if it doesn't exist
 3. Uploads vectors in batches
 4. Verifies import success
@@ -15,13 +15,15 @@ Usage:
 import json
 import sys
 import argparse
+import numpy as np
 import requests
 from typing import List, Dict, Any
 from tqdm import tqdm
 import time
 
 # Configuration
-EMBEDDINGS_FILE = "data/packing-embeddings.json"
+EMBEDDINGS_FILE = "data/packing-embeddings.jsonl"
+VECTORS_FILE = "data/packing-embeddings.npy"
 COLLECTION_NAME = "packing_knowledge"
 VECTOR_SIZE = 1536
 DISTANCE = "Cosine"  # Cosine distance for semantic similarity
@@ -29,16 +31,34 @@ BATCH_SIZE = 100  # Upload in batches for better performance
 RETRY_ATTEMPTS = 3
 RETRY_DELAY = 2  # seconds
 
-def load_embeddings(file_path: str) -> Dict[str, Any]:
-    """Load embeddings from JSON file."""
+def load_embeddings(file_path: str, vectors_path: str) -> Dict[str, Any]:
+    """Load point payloads from JSONL file and memory-map their vectors.
+
+    The metadata line is marked with "__metadata__": true; every other
+    line is an {id, payload, row_index} record pointing into the .npy
+    vectors array, which is mapped read-only rather than parsed.
+    """
     print(f"📖 Loading embeddings from {file_path}...")
 
     try:
+        points = []
+        metadata = {}
         with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get('__metadata__'):
+                    metadata = record
+                else:
+                    points.append(record)
+
+        vectors = np.load(vectors_path, mmap_mode='r')
+        if len(vectors) != len(points):
+            print(f"❌ Error: {vectors_path} has {len(vectors)} vectors for {len(points)} points")
+            sys.exit(1)
 
-        points = data.get('points', [])
-        metadata = data.get('metadata', {})
+        data = {'points': points, 'vectors': vectors, 'metadata': metadata}
 
         print(f"✅ Loaded {len(points)} points from file")
         print(f"   Model: {metadata.get('embedding_model')}")
@@ -47,8 +67,8 @@ def load_embeddings(file_path: str) -> Dict[str, Any]:
 
         return data
 
-    except FileNotFoundError:
-        print(f"❌ Error: File not found: {file_path}")
+    except FileNotFoundError as e:
+        print(f"❌ Error: File not found: {e.filename}")
         sys.exit(1)
     except json.JSONDecodeError as e:
         print(f"❌ Error parsing JSON: {e}")
@@ -124,8 +144,9 @@ def delete_collection(qdrant_url: str, collection_name: str):
     except requests.exceptions.RequestException as e:
         print(f"⚠️  Warning: Failed to delete collection: {e}")
 
-def upload_points(qdrant_url: str, collection_name: str, points: List[Dict[str, Any]]):
-    """Upload points to Qdrant in batches."""
+def upload_points(qdrant_url: str, collection_name: str, points: List[Dict[str, Any]],
+                  vectors: np.ndarray):
+    """Upload points to Qdrant in batches, reading vectors from the mapped array."""
     print(f"\n📤 Uploading {len(points)} points to Qdrant...")
     print(f"   Batch size: {BATCH_SIZE}")
 
@@ -133,7 +154,14 @@ def upload_points(qdrant_url: str, collection_name: str, points: List[Dict[str,
 
     # Process in batches
     for i in tqdm(range(0, len(points), BATCH_SIZE), desc="Uploading batches"):
-        batch = points[i:i + BATCH_SIZE]
+        batch = [
+            {
+                'id': point['id'],
+                'vector': vectors[point['row_index']].tolist(),
+                'payload': point['payload']
+            }
+            for point in points[i:i + BATCH_SIZE]
+        ]
 
         # Retry logic for uploads
         for attempt in range(RETRY_ATTEMPTS):
@@ -192,7 +220,8 @@ def verify_import(qdrant_url: str, collection_name: str, expected_count: int):
         print(f"❌ Verification failed: {e}")
         return False
 
-def print_sample_search(qdrant_url: str, collection_name: str, points: List[Dict[str, Any]]):
+def print_sample_search(qdrant_url: str, collection_name: str, points: List[Dict[str, Any]],
+                        vectors: np.ndarray):
     """Perform a sample search to demonstrate functionality."""
     print(f"\n🔍 Testing search with sample query...")
 
@@ -200,7 +229,7 @@ def print_sample_search(qdrant_url: str, collection_name: str, points: List[Dict
         return
 
     # Use first point's vector for test search
-    test_vector = points[0]['vector']
+    test_vector = vectors[points[0]['row_index']].tolist()
     test_item = points[0]['payload']['item']
 
     search_request = {
@@ -253,8 +282,9 @@ def main():
     print("=" * 70)
 
     # Load embeddings
-    data = load_embeddings(EMBEDDINGS_FILE)
+    data = load_embeddings(EMBEDDINGS_FILE, VECTORS_FILE)
     points = data.get('points', [])
+    vectors = data.get('vectors')
 
     if not points:
         print("❌ No points to import")
@@ -271,7 +301,7 @@ def main():
             create_collection(args.qdrant_url, COLLECTION_NAME, VECTOR_SIZE, DISTANCE)
         else:
             print(f"\n⚠️  Collection '{COLLECTION_NAME}' already exists")
-            print("   Use --recreate to delete and recreate, or continue to add points")
+            print("   Use --recreate to delete and recreate, or continue to upsert points")
             response = input("   Continue? [y/N]: ").strip().lower()
             if response != 'y':
                 print("Aborted")
@@ -280,13 +310,13 @@ def main():
         create_collection(args.qdrant_url, COLLECTION_NAME, VECTOR_SIZE, DISTANCE)
 
     # Upload points
-    upload_points(args.qdrant_url, COLLECTION_NAME, points)
+    upload_points(args.qdrant_url, COLLECTION_NAME, points, vectors)
 
     # Verify import
     verify_import(args.qdrant_url, COLLECTION_NAME, len(points))
 
     # Sample search
-    print_sample_search(args.qdrant_url, COLLECTION_NAME, points)
+    print_sample_search(args.qdrant_url, COLLECTION_NAME, points, vectors)
 
     print("\n" + "=" * 70)
     print("✅ Import complete!")